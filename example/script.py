@@ -1,25 +1,78 @@
+import errno
 import shutil
 import os
+import sys
 import subprocess
 
+# Batching unlinks through io_uring amortizes the user/kernel boundary across many files,
+# which matters when deleting tens of thousands of them. Requires the optional "liburing"
+# package; set FGROUP_DISABLE_IO_URING to force the plain loop.
+try:
+    if sys.platform != "linux" or os.environ.get("FGROUP_DISABLE_IO_URING"): raise ImportError
+    import liburing
+except ImportError:
+    liburing = None
+
+DELETE_BATCH = 128
+
+def _delete_one(file: str):
+    try:
+        # Try to unlink first for symlinked directories, so their subcontents don't get deleted
+        os.unlink(file)
+    except IsADirectoryError:
+        shutil.rmtree(file)
+
 def run_action_delete(files: 'list[str]'):
-    for file in files:
-        try:
-            # Try to unlink first for symlinked directories, so their subcontents don't get deleted
-            os.unlink(file)
-        except IsADirectoryError:
-            shutil.rmtree(file)
+    if liburing is None:
+        # Deletes of separate files are independent; fan out over a bounded thread pool.
+        # SSDs scale well up to ~8-16 workers, spinning disks prefer FGROUP_DELETE_CONCURRENCY=2.
+        workers = min(int(os.environ.get("FGROUP_DELETE_CONCURRENCY", "8")), len(files))
+        if workers > 1:
+            from concurrent.futures import ThreadPoolExecutor
+            with ThreadPoolExecutor(workers) as executor:
+                list(executor.map(_delete_one, files))
+        else:
+            for file in files: _delete_one(file)
+        return
 
-def run_action_backup(files: 'list[str]'):
+    ring = liburing.io_uring()
+    liburing.io_uring_queue_init(256, ring)
     try:
-        # Write files to temporary text file
-        with open("backup.txt", "w") as file:
-            file.write("\n".join(files))
-        subprocess.call(["restic", "-r", "backups-repo", "backup", "--files-from-verbatim", "backup.txt"])
+        cqe = liburing.io_uring_cqe()
+        for start in range(0, len(files), DELETE_BATCH):
+            chunk = files[start:start+DELETE_BATCH]
+            for i, file in enumerate(chunk):
+                sqe = liburing.io_uring_get_sqe(ring)
+                liburing.io_uring_prep_unlinkat(sqe, os.fsencode(file))
+                # Completions can arrive in any order, so tag each with its chunk index
+                sqe.user_data = i
+            liburing.io_uring_submit_and_wait(ring, len(chunk))
+            # Reap one completion per submitted unlink; directories fall back to rmtree
+            for _ in chunk:
+                liburing.io_uring_wait_cqe(ring, cqe)
+                res = cqe.res
+                file = chunk[cqe.user_data]
+                liburing.io_uring_cqe_seen(ring, cqe)
+                if res == -errno.EISDIR:
+                    shutil.rmtree(file)
+                elif res < 0:
+                    # Surface other failures the same way the plain loop would
+                    raise OSError(-res, os.strerror(-res), file)
     finally:
-        # Clean up temporary text file
-        if os.path.exists("backup.txt"): os.unlink("backup.txt")
+        liburing.io_uring_queue_exit(ring)
+
+def run_action_backup(files: 'list[str]'):
+    # Pipe the file list straight into restic's stdin; no temporary file needed
+    proc = subprocess.Popen(
+        ["restic", "-r", "backups-repo", "backup", "--files-from-verbatim", "-"],
+        stdin=subprocess.PIPE
+    )
+    assert proc.stdin is not None
+    for file in files:
+        proc.stdin.write(file.encode() + b"\n")
+    proc.stdin.close()
+    proc.wait()
 
 def run_actions(groups: 'dict[str, list[str]]'):
     for group, files in groups.items():
-        print(f"{group:>10}:  {len(files)} items")
\ No newline at end of file
+        print(f"{group:>10}:  {len(files)} items")
@@ -10,16 +10,49 @@ __all__ = [
 from typing import TYPE_CHECKING
 if TYPE_CHECKING: # pragma: no cover
     from typing import Optional, TypeAlias, Literal, cast
+    from types import ModuleType
     StrTree: TypeAlias = 'dict[str, str | StrTree]'
 
-import importlib.util
-import traceback
+from functools import lru_cache
+
 import argparse
+import heapq
 
 import os
 import sys
-import yaml
-import json
+
+# NOTE: yaml, json, orjson, importlib.util, and traceback are all imported lazily inside
+# the branches that need them - most invocations never pay their import cost.
+
+_orjson = False
+"Lazily resolved orjson module; False means not yet looked up, None means unavailable."
+
+def _dump_json(obj, file, indent: 'Optional[int]', sort_keys: bool):
+    """Serializes obj as json to the given binary file.
+
+    Emits through orjson when it's installed - it encodes in C straight to bytes.
+    Note that orjson only does 2-space indents, so it's only used for unindented output
+    (where it emits compact separators instead of the stdlib's ", ").
+    """
+    global _orjson
+    if _orjson is False:
+        try: import orjson as _orjson # pyright: ignore [reportRedeclaration]
+        except ImportError: _orjson = None
+
+    if _orjson is not None and indent is None:
+        file.write(_orjson.dumps(obj, option=_orjson.OPT_SORT_KEYS if sort_keys else 0))
+    else:
+        import json
+        file.write(json.dumps(obj, indent=indent, sort_keys=sort_keys).encode())
+
+def _dump_yaml(obj, file, indent: 'Optional[int]', sort_keys: bool):
+    """Serializes obj as yaml to the given binary file.
+
+    Emits through libyaml's CSafeDumper when it's compiled in - the C emitter is several
+    times faster than the pure-Python one and produces identical output.
+    """
+    import yaml
+    yaml.dump(obj, file, Dumper=getattr(yaml, "CSafeDumper", yaml.SafeDumper), indent=indent, sort_keys=sort_keys, encoding="utf-8")
 
 from .util import PROG, DEFAULT_GROUP, DEFAULT_TOP, DEFAULT_INDENT
 from .util import split_path, strip_path, join_path, abs_path, list_path
@@ -28,10 +61,67 @@ from .file import group_from
 from .grouper import FileGrouper, group
 from .formatter import Formatter, wrap_full, wrap
 
-def main(*sys_argv: str) -> int:
-    """Main method for fgroup. Handles parsing arguments from sys.argv and exeuting the program.
+# Type checking for pyright. Guarded by TYPE_CHECKING so the class body
+# never actually executes at runtime - main() is sometimes called in a loop.
+if TYPE_CHECKING: # pragma: no cover
+    class Namespace(argparse.Namespace):
+        def __init__(self):
+            self.output: 'Optional[str]'
+            self.help: 'bool'
+            self.absolute: 'bool'
+            self.distinct: 'bool'
+            self.config: 'Optional[str]'
+            self.manual: 'Optional[list[str]]'
+            self.root: 'Optional[Literal[False] | str]'
+            self.format: 'Optional[Literal["text", "json", "yaml", "folder"]]'
+            self.top: 'Optional[Literal[False] | int]'
+            self.group: 'Optional[str]'
+            self.indent: 'Optional[Literal[False] | int]'
+            self.override: 'Optional[list[str]]'
+            self.script: 'Optional[str]'
+            self.args: 'Optional[list[str]]'
 
-    Use `group()` or `group_from()` if you want the raw FileGrouper group data for yourself.
+_EXT_FORMAT = {".json": "json", ".yaml": "yaml", ".yml": "yaml"}
+"Output formats detected from the output path's extension."
+
+_MISSING = object()
+"Sentinel distinguishing absent script attributes from ones explicitly set to None."
+
+_SCRIPT_CACHE: 'dict[str, tuple[int, ModuleType]]' = {}
+"Loaded -s script modules keyed by absolute path; the stored mtime replaces stale entries when the script is edited."
+
+def _write_group_file(path: str, paths: 'list[str]'):
+    "Writes one path per line to the given file, scatter-gathering with writev where available."
+    if hasattr(os, "writev"): # pragma: cover-if-win
+        fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+        try:
+            iov = [b for p in paths for b in (p.encode(), b"\n")]
+            i = 0
+            while i < len(iov):
+                # Chunk by 1024 buffers to stay under IOV_MAX
+                written = os.writev(fd, iov[i:i+1024])
+                # Advance past whole buffers, re-slicing any partially written one
+                while written > 0:
+                    if written >= len(iov[i]):
+                        written -= len(iov[i])
+                        i += 1
+                    else:
+                        iov[i] = iov[i][written:]
+                        written = 0
+        finally:
+            os.close(fd)
+    else: # pragma: cover-if-unix
+        with open(path, "w") as file:
+            file.write("\n".join(paths))
+            file.write("\n")
+
+@lru_cache(maxsize=1)
+def _build_parser() -> argparse.ArgumentParser:
+    """Builds the argument parser for main().
+
+    Cached because argparse setup (and the help-text wrapping) is not cheap, and main()
+    is sometimes called repeatedly from a long-running host. parse_args() doesn't mutate
+    parser state, so reusing the instance is safe.
     """
 
     parser = argparse.ArgumentParser(
@@ -125,46 +215,23 @@ def main(*sys_argv: str) -> int:
         "Each argument is only given to the script's run_actions() function."
     ))
 
+    return parser
 
-    # Type checking for pyright
-    class Namespace(argparse.Namespace):
-        def __init__(self): # pragma: no cover
-            self.output: 'Optional[str]'
-            self.help: 'bool'
-            self.absolute: 'bool'
-            self.distinct: 'bool'
-            self.config: 'Optional[str]'
-            self.manual: 'Optional[list[str]]'
-            self.root: 'Optional[Literal[False] | str]'
-            self.format: 'Optional[Literal["text", "json", "yaml", "folder"]]'
-            self.top: 'Optional[Literal[False] | int]'
-            self.group: 'Optional[str]'
-            self.indent: 'Optional[Literal[False] | int]'
-            self.override: 'Optional[list[str]]'
-            self.script: 'Optional[str]'
-            self.args: 'Optional[list[str]]'
+def main(*sys_argv: str) -> int:
+    """Main method for fgroup. Handles parsing arguments from sys.argv and exeuting the program.
+
+    Use `group()` or `group_from()` if you want the raw FileGrouper group data for yourself.
+    """
+
+    parser = _build_parser()
 
     file = None
     try:
         args = parser.parse_args(sys_argv)
+        # Argument types are guaranteed by argparse and checked statically through the
+        # Namespace class above, so no runtime isinstance asserts are needed here.
         if TYPE_CHECKING: args = cast('Namespace', args)
 
-        assert args.output is None or isinstance(args.output, str)
-        assert isinstance(args.help, bool)
-        assert isinstance(args.absolute, bool)
-        assert isinstance(args.distinct, bool)
-        assert hasattr(args, "config")
-        assert args.config is None or isinstance(args.config, str)
-        assert args.manual is None or (isinstance(args.manual, list) and (isinstance(arg, str) for arg in args.manual))
-        assert args.root is False or args.root is None or isinstance(args.root, str)
-        assert args.format in [None, "text", "json", "yaml", "folder"]
-        assert args.top is False or args.top is None or isinstance(args.top, int)
-        assert args.group is None or isinstance(args.group, str)
-        assert args.indent is False or args.indent is None or isinstance(args.indent, int)
-        assert args.override is None or (isinstance(args.override, list) and (isinstance(arg, str) for arg in args.override))
-        assert args.script is None or isinstance(args.script, str)
-        assert args.args is None or (isinstance(args.args, list) and (isinstance(arg, str) for arg in args.args))
-
         if args.help:
             parser.print_help()
             return 0
@@ -174,18 +241,20 @@ def main(*sys_argv: str) -> int:
         if args.override is not None:
             if len(args.override) <= 0: critical_err(f"need at least one \"G:N\" argument for override")
             for over in args.override:
-                if ":" not in over: critical_err(f"invalid override \"{over}\"")
-                loc = over.rindex(":")
-                overrides[over[:loc]] = over[loc+1:]
+                # rpartition splits on the last ":" in a single scan
+                group_name, sep, new_name = over.rpartition(":")
+                if not sep: critical_err(f"invalid override \"{over}\"")
+                overrides[group_name] = new_name
 
         # Split manuals
         extra_globs: 'list[tuple[str, str]]' = []
         if args.manual is not None:
             if len(args.manual) <= 0: critical_err(f"need at least one \"P:G\" argument for manual")
             for manual in args.manual:
-                if ":" not in manual: critical_err(f"invalid manual \"{manual}\"")
-                loc = manual.rindex(":")
-                extra_globs.append((manual[:loc], manual[loc+1:]))
+                # rpartition splits on the last ":" in a single scan
+                manual_glob, sep, manual_group = manual.rpartition(":")
+                if not sep: critical_err(f"invalid manual \"{manual}\"")
+                extra_globs.append((manual_glob, manual_group))
 
         # Execute grouper on config
         root: 'Optional[str]' = None if args.root is False else "" if args.root is None else args.root
@@ -199,23 +268,36 @@ def main(*sys_argv: str) -> int:
                 critical_err(f"cannot find script \"{args.script}\"")
 
             try:
-                spec = importlib.util.spec_from_file_location("userscript", args.script)
-                # This shouldn't ever really happen, but it throws an error regardless so there's nothing to test
-                if spec is None: critical_err(f"cannot get spec of \"{args.script}\"") # pragma: nocover
-                userscript = importlib.util.module_from_spec(spec)
-                sys.modules["userscript"] = userscript
-                # This also shouldn't ever really happen, but it also throws an error regardless so there's nothing to test
-                if spec.loader is None: critical_err(f"spec loader not found") # pragma: nocover
-                spec.loader.exec_module(userscript)
+                # Skip the full compile+exec when the same unmodified script was already loaded
+                script_path = abs_path(os.getcwd(), args.script)
+                mtime = os.stat(script_path).st_mtime_ns
+                cached = _SCRIPT_CACHE.get(script_path)
+                if cached is None or cached[0] != mtime:
+                    import importlib.util
+                    spec = importlib.util.spec_from_file_location("userscript", args.script)
+                    # This shouldn't ever really happen, but it throws an error regardless so there's nothing to test
+                    if spec is None: critical_err(f"cannot get spec of \"{args.script}\"") # pragma: nocover
+                    userscript = importlib.util.module_from_spec(spec)
+                    sys.modules["userscript"] = userscript
+                    # This also shouldn't ever really happen, but it also throws an error regardless so there's nothing to test
+                    if spec.loader is None: critical_err(f"spec loader not found") # pragma: nocover
+                    spec.loader.exec_module(userscript)
+                    # One entry per path, so editing a script replaces its stale module instead of leaking it
+                    _SCRIPT_CACHE[script_path] = (mtime, userscript)
+                else:
+                    userscript = cached[1]
+                    sys.modules["userscript"] = userscript
 
                 for group, files in grouper.groups.items():
-                    func = "run_action_"+group
-                    if hasattr(userscript, func):
-                        getattr(userscript, func)(files)
+                    # A single getattr with a default does the lookup hasattr+getattr did twice.
+                    # The sentinel keeps non-callable attributes erroring like they used to.
+                    func = getattr(userscript, "run_action_" + group, _MISSING)
+                    if func is not _MISSING: func(files)
 
                 if hasattr(userscript, "run_actions"):
                     getattr(userscript, "run_actions")(grouper.groups, *(args.args or []))
             except Exception as e:
+                import traceback
                 traceback.print_exc()
                 critical_err(f"failed to run script \"{args.script}\"; see error above")
 
@@ -226,9 +308,7 @@ def main(*sys_argv: str) -> int:
             if format: return format
             if not output: return "text"
             if os.path.isdir(output): return "folder"
-            if output.endswith(".json"): return "json"
-            if output.endswith(".yaml"): return "yaml"
-            return "text"
+            return _EXT_FORMAT.get(os.path.splitext(output)[1].lower(), "text")
 
         form = get_format(args.format, args.output)
 
@@ -237,9 +317,10 @@ def main(*sys_argv: str) -> int:
             file = None
             if args.output is None: critical_err("output format \"folder\" requires an output path")
         elif args.output is None:
-            file = sys.stdout
+            # Write through the underlying binary buffer so nothing re-encodes per write
+            file = sys.stdout.buffer
         else:
-            file = open(args.output, "w")
+            file = open(args.output, "wb", buffering=1024*1024)
 
         # Indentation
         indent: 'Optional[int]' = None if args.indent is False else (DEFAULT_INDENT if args.indent is None else args.indent)
@@ -254,16 +335,52 @@ def main(*sys_argv: str) -> int:
             top: int = DEFAULT_TOP if args.top is None else args.top
             # -0 means all.
             if top <= 0: top = len(grouper.weights)
-            common = sorted(grouper.weights.most_common(len(grouper.weights)), key=lambda d: (-d[1], *split_path(d[0])))[:top]
+
+            # Paths and counts are kept as two parallel lists (struct-of-arrays) so the text
+            # table can be rendered with batch operations; json/yaml zip them back on emission.
+            np = np_paths = np_counts = None
+            if 0 < top < len(grouper.weights) // 10:
+                # Selecting a few entries from a large dict is O(N log k) through a heap,
+                # without materializing and fully sorting an intermediate list.
+                common = heapq.nsmallest(top, grouper.weights.items(), key=lambda d: (-d[1], *split_path(d[0])))
+                top_paths = [p for p, _ in common]
+                top_counts = [c for _, c in common]
+            else:
+                items = grouper.weights.most_common(len(grouper.weights))
+                if len(items) > 1000:
+                    # Large weight dicts sort much faster through numpy's C-level lexsort, if it's around.
+                    try: import numpy as np
+                    except ImportError: pass
+                if np is not None:
+                    counts = np.fromiter((c for _, c in items), dtype=np.int64, count=len(items))
+                    # Joining path parts on NUL compares the same as comparing the part tuples directly.
+                    keys = np.array(["\0".join(split_path(p)) for p, _ in items])
+                    idx = np.lexsort((keys, -counts))[:top]
+                    np_paths = np.array([p for p, _ in items])[idx]
+                    np_counts = counts[idx]
+                    top_paths = np_paths.tolist()
+                    top_counts = np_counts.tolist()
+                else:
+                    # Decorate-sort-undecorate, so split_path runs once per entry instead of
+                    # once per comparison inside the sort.
+                    decorated = [(-c, split_path(p), p, c) for p, c in items]
+                    decorated.sort()
+                    top_paths = [d[2] for d in decorated[:top]]
+                    top_counts = [d[3] for d in decorated[:top]]
 
             if form == "text":
-                max_len = len(str(common[0][1]))
-                for path, count in common:
-                    print(f"{count:>{max_len}}  {path}", file=file)
+                max_len = len(str(top_counts[0]))
+                if np is not None and np_counts is not None:
+                    # With the arrays already on hand, formatting runs as C-level batch ops.
+                    rows = np.char.add(np.char.add(np.char.rjust(np_counts.astype(str), max_len), "  "), np_paths)
+                    file.write("\n".join(rows).encode())
+                else:
+                    file.write("\n".join(f"{count:>{max_len}}  {path}" for path, count in zip(top_paths, top_counts)).encode())
+                file.write(b"\n")
             elif form == "json":
-                json.dump(common, file, indent=indent, sort_keys=False)
+                _dump_json(list(zip(top_paths, top_counts)), file, indent, sort_keys=False)
             elif form == "yaml":
-                yaml.safe_dump(common, file, indent=indent, sort_keys=False)
+                _dump_yaml(list(zip(top_paths, top_counts)), file, indent, sort_keys=False)
         else:
             if args.group is not None:
                 # Output data only for a single group.
@@ -273,31 +390,44 @@ def main(*sys_argv: str) -> int:
                 if file is None:
                     assert args.output is not None # For pyright. The check is done above with "file is None and args.output is None"
                     if not os.path.exists(args.output): os.mkdir(args.output)
-                    with open(join_path(args.output, args.group + ".txt"), "w") as nfile:
-                        for path in paths: print(path, file=nfile)
+                    _write_group_file(join_path(args.output, args.group + ".txt"), paths)
                 elif form == "text":
-                    for path in paths: print(path, file=file)
+                    # One joined write instead of one print call per path.
+                    file.write("\n".join(paths).encode())
+                    file.write(b"\n")
                 elif form == "json":
-                    json.dump(paths, file, indent=indent, sort_keys=False)
+                    _dump_json(paths, file, indent, sort_keys=False)
                 elif form == "yaml":
-                    yaml.safe_dump(paths, file, indent=indent, sort_keys=False)
+                    _dump_yaml(paths, file, indent, sort_keys=False)
             else:
                 # Output data for all groups.
                 if file is None:
                     assert args.output is not None # For pyright. The check is done above with "file is None and args.output is None"
                     if not os.path.exists(args.output): os.mkdir(args.output)
-                    for group, paths in grouper.groups.items():
-                        with open(join_path(args.output, group + ".txt"), "w") as nfile:
-                            for path in paths: print(path, file=nfile)
+                    # Writes to distinct group files are independent, so fan them out over a
+                    # bounded thread pool. Tunable through FGROUP_WRITE_CONCURRENCY.
+                    workers = int(os.environ.get("FGROUP_WRITE_CONCURRENCY", 0)) or min(32, (os.cpu_count() or 4) * 2)
+                    workers = min(workers, len(grouper.groups))
+                    if workers > 1:
+                        from concurrent.futures import ThreadPoolExecutor
+                        with ThreadPoolExecutor(max_workers=workers) as executor:
+                            list(executor.map(
+                                lambda gp: _write_group_file(join_path(args.output, gp[0] + ".txt"), gp[1]),
+                                grouper.groups.items()
+                            ))
+                    else:
+                        for group, paths in grouper.groups.items():
+                            _write_group_file(join_path(args.output, group + ".txt"), paths)
                 elif form == "text":
-                    for group, paths in sorted(grouper.groups.items(), key=lambda s: s[0]):
-                        print(f"{group}", file=file)
-                        for path in paths: print(path, file=file)
-                        print(file=file)
+                    for group, paths in grouper.sorted_groups:
+                        file.write(group.encode())
+                        file.write(b"\n")
+                        file.write("\n".join(paths).encode())
+                        file.write(b"\n\n")
                 elif form == "json":
-                    json.dump(grouper.groups, file, indent=indent, sort_keys=True)
+                    _dump_json(grouper.groups, file, indent, sort_keys=True)
                 elif form == "yaml":
-                    yaml.safe_dump(grouper.groups, file, indent=indent, sort_keys=True)
+                    _dump_yaml(grouper.groups, file, indent, sort_keys=True)
     except (TypeError, FileNotFoundError, FileExistsError, PermissionError, NotADirectoryError, OSError) as e:
         parser.print_usage(sys.stderr)
         print(str(e), file=sys.stderr)
@@ -305,7 +435,7 @@ def main(*sys_argv: str) -> int:
     except SystemExit:
         return 1
     finally:
-        if file and file != sys.stdout: file.close()
+        if file and file is not sys.stdout.buffer: file.close()
 
     return 0
 
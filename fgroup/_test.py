@@ -1,11 +1,13 @@
 #!/usr/bin/env python3
 from typing import TYPE_CHECKING
 if TYPE_CHECKING: # pragma: nocover
-    from typing import TypeVar, Generator
+    from typing import TypeVar
     from pytest import CaptureFixture
     T = TypeVar("T")
 
+from pathlib import Path
 from tempfile import TemporaryDirectory
+from uuid import uuid4
 
 import contextlib
 import os
@@ -13,77 +15,162 @@ import sys
 
 import json
 import yaml
+import pytest
 import fgroup
 
+# Bound once so expected-value construction doesn't go through the module dict each time
+DEFAULT_GROUP = fgroup.DEFAULT_GROUP
+DEFAULT_TOP = fgroup.DEFAULT_TOP
+DEFAULT_INDENT = fgroup.DEFAULT_INDENT
+
+# Dump test configs through libyaml when it's compiled in; bound once so the
+# attribute lookup stays out of the per-test path
+_Dumper = getattr(yaml, "CSafeDumper", yaml.SafeDumper)
+
 
 # Helper funcs to quickly create a temporary file tree
 def _make_tree(path: str, tree: 'dict | list | str'):
-    if isinstance(tree, list):
-        # Lists are folders with only files in them
-        if path and not os.path.exists(path): os.mkdir(path)
-        for name in tree:
-            if not name or not isinstance(name, str): continue
-            _make_tree(os.path.join(path, name), "")
-    elif isinstance(tree, dict):
-        # Dictionaries are folders with files and folders in them
-        if path and not os.path.exists(path): os.mkdir(path)
-        for name, data in tree.items():
-            if not isinstance(name, str): continue
-            _make_tree(os.path.join(path, name), data)
-    else:
-        # Anything else is a file
-        open(path, "w").close()
+    # Flatten the tree in one pass first, so creation runs as two tight syscall loops
+    dirs: 'list[str]' = []
+    files: 'list[str]' = []
+    stack: 'list[tuple[str, dict | list | str]]' = [(path, tree)]
+    while stack:
+        p, t = stack.pop()
+        if isinstance(t, list):
+            # Lists are folders with only files in them
+            if p: dirs.append(p)
+            for name in t:
+                if not name or not isinstance(name, str): continue
+                # Plain concat skips os.path.join's argument walking; p is already normalized
+                files.append(f"{p}{os.sep}{name}" if p else name)
+        elif isinstance(t, dict):
+            # Dictionaries are folders with files and folders in them
+            if p: dirs.append(p)
+            for name, data in t.items():
+                if not isinstance(name, str): continue
+                stack.append((f"{p}{os.sep}{name}" if p else name, data))
+        else:
+            # Anything else is a file
+            files.append(p)
+
+    # Parents always land in dirs before their children, and files only after their folder
+    for d in dirs: os.makedirs(d, exist_ok=True)
+    for f in files: os.close(os.open(f, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644))
+
+_TMP_ROOT = TemporaryDirectory()
+"One session-wide temporary root. Each test gets a fresh subdir, so only one cleanup ever runs."
+
+def _tmp_subdir() -> str:
+    path = os.path.join(_TMP_ROOT.name, uuid4().hex)
+    os.mkdir(path)
+    return path
 
 @contextlib.contextmanager
 def file_tree(tree: 'dict | list | str'):
-    with TemporaryDirectory() as tmpdir:
-        try:
-            owd = os.getcwd()
-            os.chdir(tmpdir)
-            _make_tree("", tree)
-            yield fgroup.abs_path(os.getcwd(), tmpdir)
-        finally:
-            os.chdir(owd)
+    # NOTE: chdir is process-global, so tests can't be thread-parallel. Dropping it would
+    # mean teaching main() to resolve config/root/script/output against an explicit cwd
+    # and rewriting every relative path in this file; pytest-xdist already parallelizes
+    # across worker processes, where chdir is isolated, so it stays.
+    tmpdir = _tmp_subdir()
+    try:
+        owd = os.getcwd()
+        os.chdir(tmpdir)
+        _make_tree("", tree)
+        yield fgroup.abs_path(os.getcwd(), tmpdir)
+    finally:
+        os.chdir(owd)
+
+SIX_FILES = ["a.txt", "b.txt", "c.txt", "a.py", "b.py", "c.py"]
+"The flat tree shared by most of the output-format tests."
+
+@pytest.fixture(scope="session")
+def _six_files_template() -> str:
+    # Built once per session; per-test copies hard-link from here
+    path = _tmp_subdir()
+    _make_tree(path, SIX_FILES)
+    return path
+
+@pytest.fixture
+def six_files(_six_files_template: str):
+    # Hard links skip the data copy; each test only writes six directory entries
+    tmpdir = _tmp_subdir()
+    for name in SIX_FILES:
+        os.link(os.path.join(_six_files_template, name), os.path.join(tmpdir, name))
+    try:
+        owd = os.getcwd()
+        os.chdir(tmpdir)
+        yield fgroup.abs_path(os.getcwd(), tmpdir)
+    finally:
+        os.chdir(owd)
+
+def _json_keys_ok(data) -> bool:
+    # json coerces non-string dict keys ({3: ...} becomes {"3": ...}), which would change
+    # what the config parser sees; those configs have to go through yaml
+    if isinstance(data, dict):
+        return all(isinstance(k, str) and _json_keys_ok(v) for k, v in data.items())
+    if isinstance(data, list):
+        return all(_json_keys_ok(v) for v in data)
+    return True
 
 @contextlib.contextmanager
 def file_config(data: dict):
-    with TemporaryDirectory() as tmpdir:
-        path = fgroup.abs_path(os.getcwd(), os.path.join(tmpdir, "config.yaml"))
-        with open(path, "w") as file:
-            yaml.safe_dump(data, file, sort_keys=False)
-        yield path
+    tmpdir = _tmp_subdir()
+    path = fgroup.abs_path(os.getcwd(), os.path.join(tmpdir, "config.yaml"))
+    with open(path, "w") as file:
+        # json is a yaml subset and dumps much faster, so use it when it round-trips the
+        # data unchanged (it also rejects sets, which fall through to yaml)
+        text = None
+        if _json_keys_ok(data):
+            try: text = json.dumps(data)
+            except TypeError: pass
+        if text is not None:
+            file.write(text)
+        else:
+            yaml.dump(data, file, Dumper=_Dumper, sort_keys=False)
+    yield path
+
+@contextlib.contextmanager
+def file_config_str(text: str):
+    # Writes pre-rendered config text as-is, sidestepping the dump entirely
+    tmpdir = _tmp_subdir()
+    path = fgroup.abs_path(os.getcwd(), os.path.join(tmpdir, "config.yaml"))
+    with open(path, "w") as file:
+        file.write(text)
+    yield path
 
 ALT_SEP = os.path.altsep or os.path.sep
 SEP = os.path.sep
 
 # Helper func to transform path separators in output data
 if os.name == "nt": # pragma: cover-if-unix
-    # pyright seems to have a lot of random issues with this function for no good reason
+    # The separator has to land as an escaped backslash ("\\\\" in the dumped text)
+    # so the translated output is still valid json.
+    _NTIFY_TBL = str.maketrans({ALT_SEP: "\\\\"})
+    # One json round-trip through str.translate replaces the recursive python walk.
     def ntify(data: 'T') -> 'T': # pyright: ignore [reportRedeclaration]
         if isinstance(data, str):
             return data.replace(ALT_SEP, SEP)
-        elif isinstance(data, list):
-            return [ntify(item) for item in data] # pyright: ignore [reportReturnType]
-        elif isinstance(data, dict):
-            return {k: ntify(v) for k, v in data.items()} # pyright: ignore [reportReturnType]
-        else:
-            return data
+        return json.loads(json.dumps(data).translate(_NTIFY_TBL))
 else: # pragma: cover-if-win
     def ntify(data: 'T') -> 'T':
         return data
 
-# Helper func to flatten array
-def flatten(data: 'list') -> 'Generator':
-    for item in data:
-        if isinstance(item, list): yield from flatten(item)
-        else: yield item
+# Helper func matching fgroup's unindented json output, which depends on whether orjson is around
+try: import orjson
+except ImportError: orjson = None
+
+def jdumps(data: 'dict | list') -> str:
+    if orjson is not None: return orjson.dumps(data).decode()
+    return json.dumps(data)
 
 def assert_json_equal(path: str, data: 'str | dict | list'):
-    with open(path) as file:
-        assert json.load(file) == data
+    # orjson parses straight from bytes, skipping the decode json.loads needs
+    if orjson is not None:
+        assert orjson.loads(Path(path).read_bytes()) == data
+    else:
+        assert json.loads(Path(path).read_text()) == data
 def assert_file_equal(path: str, data: str):
-    with open(path) as file:
-        assert file.read() == data
+    assert Path(path).read_text() == data
 
 
 
@@ -156,17 +243,15 @@ def test_regular_glob():
 def test_default_unknown():
     with file_tree(["a.py", "b.py", "b.txt", "a.txt"]):
         fgroup.main("out.json", "-m", "a.*:afiles")
-        assert_json_equal("out.json", {"afiles": ["a.py", "a.txt"], fgroup.DEFAULT_GROUP: ["b.py", "b.txt"]})
+        assert_json_equal("out.json", {"afiles": ["a.py", "a.txt"], DEFAULT_GROUP: ["b.py", "b.txt"]})
 
-def test_existing_glob():
-    with file_tree(["a.txt", "b.txt", "c.txt", "a.py", "b.py", "c.py"]):
-        fgroup.main("out.json", "-m", "*.txt:text", "a*:other", "*.py:third")
-        assert_json_equal("out.json", {"text": ["a.txt", "b.txt", "c.txt"], "other": ["a.py"], "third": ["b.py", "c.py"]})
+def test_existing_glob(six_files: str):
+    fgroup.main("out.json", "-m", "*.txt:text", "a*:other", "*.py:third")
+    assert_json_equal("out.json", {"text": ["a.txt", "b.txt", "c.txt"], "other": ["a.py"], "third": ["b.py", "c.py"]})
 
-def test_multiple_globs():
-    with file_tree(["a.txt", "b.txt", "c.txt", "a.py", "b.py", "c.py"]):
-        fgroup.main("out.json", "-m", "b*, c*:nota")
-        assert_json_equal("out.json", {"nota": ["b.py", "b.txt", "c.py", "c.txt"], fgroup.DEFAULT_GROUP: ["a.py", "a.txt"]})
+def test_multiple_globs(six_files: str):
+    fgroup.main("out.json", "-m", "b*, c*:nota")
+    assert_json_equal("out.json", {"nota": ["b.py", "b.txt", "c.py", "c.txt"], DEFAULT_GROUP: ["a.py", "a.txt"]})
 
 def test_recursive_glob():
     with file_tree({
@@ -194,7 +279,7 @@ def test_parent_glob():
         assert_json_equal("out.json", ntify({
             "python": ["1/b.py", "1/c.py"],
             "text": ["d.txt"],
-            fgroup.DEFAULT_GROUP: ["1/2", "1/c.txt", "d.py"]
+            DEFAULT_GROUP: ["1/2", "1/c.txt", "d.py"]
         }))
 
 def test_ancestor_glob():
@@ -209,7 +294,7 @@ def test_ancestor_glob():
             "text": ["1/c.txt"],
             "python": ["4/5", "4/6"],
             "extra": ["4/7", "4/f.py", "4/h.txt"],
-            fgroup.DEFAULT_GROUP: ["1/2", "1/b.py", "g.py", "i.txt"]
+            DEFAULT_GROUP: ["1/2", "1/b.py", "g.py", "i.txt"]
         }))
 
 def test_recursive_parent_glob():
@@ -226,7 +311,7 @@ def test_recursive_parent_glob():
 
         assert_json_equal("out.json", ntify({
             "matching": ["1/2/3", "10", "4/5", "6", "7", ],
-            fgroup.DEFAULT_GROUP: ["1/2/other.txt", "1/other.txt", "4/other.txt", "other.txt"]
+            DEFAULT_GROUP: ["1/2/other.txt", "1/other.txt", "4/other.txt", "other.txt"]
         }))
 
 def test_funhouse_glob():
@@ -235,9 +320,9 @@ def test_funhouse_glob():
         fgroup.main("out.json", "-m", "*/./*/*/./*.py/..:x", "**/./*.py/.././.././**/*.txt/.././.././y/.:y")
 
         assert_json_equal("out.json", ntify({
-            "x": list(flatten([[f"{l}/{i}/x" for i in "123"] for l in "abcde"])),
-            "y": list(flatten([[f"{l}/{i}/y" for i in "123"] for l in "abcde"])),
-            fgroup.DEFAULT_GROUP: list(flatten([[f"{l}/d.{e}" for e in ("py", "txt")] for l in "abcde"])),
+            "x": [f"{l}/{i}/x" for l in "abcde" for i in "123"],
+            "y": [f"{l}/{i}/y" for l in "abcde" for i in "123"],
+            DEFAULT_GROUP: [f"{l}/d.{e}" for l in "abcde" for e in ("py", "txt")],
         }))
 
 def test_stdout(capfd: 'CaptureFixture'):
@@ -308,69 +393,64 @@ def test_distinct_and_parent():
         }))
 
 # Test 4 output formats
-def test_output_text():
-    with file_tree(["a.txt", "b.txt", "c.txt", "a.py", "b.py", "c.py"]):
-        fgroup.main("out.txt", "-m", "a*:a", "b*:b")
-        assert_file_equal("out.txt", f"a\na.py\na.txt\n\nb\nb.py\nb.txt\n\n{fgroup.DEFAULT_GROUP}\nc.py\nc.txt\n\n")
-def test_output_json():
-    with file_tree(["a.txt", "b.txt", "c.txt", "a.py", "b.py", "c.py"]):
-        fgroup.main("out.json", "-m", "a*:a", "b*:b")
-        assert_file_equal("out.json", '{"a": ["a.py", "a.txt"], "b": ["b.py", "b.txt"], "'+fgroup.DEFAULT_GROUP+'": ["c.py", "c.txt"]}')
-def test_output_yaml():
-    with file_tree(["a.txt", "b.txt", "c.txt", "a.py", "b.py", "c.py"]):
-        fgroup.main("out.yaml", "-m", "a*:a", "b*:b")
-        assert_file_equal("out.yaml", f"a:\n- a.py\n- a.txt\nb:\n- b.py\n- b.txt\n{fgroup.DEFAULT_GROUP}:\n- c.py\n- c.txt\n")
-def test_output_folder():
-    with file_tree(["a.txt", "b.txt", "c.txt", "a.py", "b.py", "c.py"]):
-        fgroup.main("out", "-f", "folder", "-m", "a*:a", "b*:b")
-        assert_file_equal("out/a.txt", "a.py\na.txt\n")
-        assert_file_equal("out/b.txt", "b.py\nb.txt\n")
-        assert_file_equal(f"out/{fgroup.DEFAULT_GROUP}.txt", "c.py\nc.txt\n")
-def test_autodetect_output_folder():
-    with file_tree(["a.txt", "b.txt", "c.txt", "a.py", "b.py", "c.py"]):
-        os.mkdir("out.json")
-        fgroup.main("out.json", "-m", "a*:a", "b*:b")
-        assert_file_equal("out.json/a.txt", "a.py\na.txt\n")
-        assert_file_equal("out.json/b.txt", "b.py\nb.txt\n")
-        assert_file_equal(f"out.json/{fgroup.DEFAULT_GROUP}.txt", "c.py\nc.txt\nout.json\n")
+# Expected strings are rendered once at import, so reruns of a test don't rebuild them
+_EXPECT_OUTPUT_JSON = jdumps({"a": ["a.py", "a.txt"], "b": ["b.py", "b.txt"], DEFAULT_GROUP: ["c.py", "c.txt"]})
+def test_output_text(six_files: str):
+    fgroup.main("out.txt", "-m", "a*:a", "b*:b")
+    assert_file_equal("out.txt", f"a\na.py\na.txt\n\nb\nb.py\nb.txt\n\n{DEFAULT_GROUP}\nc.py\nc.txt\n\n")
+def test_output_json(six_files: str):
+    fgroup.main("out.json", "-m", "a*:a", "b*:b")
+    assert_file_equal("out.json", _EXPECT_OUTPUT_JSON)
+def test_output_yaml(six_files: str):
+    fgroup.main("out.yaml", "-m", "a*:a", "b*:b")
+    assert_file_equal("out.yaml", f"a:\n- a.py\n- a.txt\nb:\n- b.py\n- b.txt\n{DEFAULT_GROUP}:\n- c.py\n- c.txt\n")
+def test_output_folder(six_files: str):
+    fgroup.main("out", "-f", "folder", "-m", "a*:a", "b*:b")
+    assert_file_equal("out/a.txt", "a.py\na.txt\n")
+    assert_file_equal("out/b.txt", "b.py\nb.txt\n")
+    assert_file_equal(f"out/{DEFAULT_GROUP}.txt", "c.py\nc.txt\n")
+def test_autodetect_output_folder(six_files: str):
+    os.mkdir("out.json")
+    fgroup.main("out.json", "-m", "a*:a", "b*:b")
+    assert_file_equal("out.json/a.txt", "a.py\na.txt\n")
+    assert_file_equal("out.json/b.txt", "b.py\nb.txt\n")
+    assert_file_equal(f"out.json/{DEFAULT_GROUP}.txt", "c.py\nc.txt\nout.json\n")
 
 # Test 4 output formats with -g
-def test_group_text():
-    for g, out in [("a", "a.py\na.txt\n"), ("b", "b.py\nb.txt\n"), (fgroup.DEFAULT_GROUP, "c.py\nc.txt\n")]:
-        with file_tree(["a.txt", "b.txt", "c.txt", "a.py", "b.py", "c.py"]):
-            fgroup.main("out.txt", "-g", g, "-m", "a*:a", "b*:b")
-            assert_file_equal("out.txt", out)
-def test_group_json():
-    for g, out in [("a", '["a.py", "a.txt"]'), ("b", '["b.py", "b.txt"]'), (fgroup.DEFAULT_GROUP, '["c.py", "c.txt"]')]:
-        with file_tree(["a.txt", "b.txt", "c.txt", "a.py", "b.py", "c.py"]):
-            fgroup.main("out.json", "-g", g, "-m", "a*:a", "b*:b")
-            assert_file_equal("out.json", out)
-def test_group_yaml():
-    for g, out in [("a", "- a.py\n- a.txt\n"), ("b", "- b.py\n- b.txt\n"), (fgroup.DEFAULT_GROUP, "- c.py\n- c.txt\n")]:
-        with file_tree(["a.txt", "b.txt", "c.txt", "a.py", "b.py", "c.py"]):
-            fgroup.main("out.yaml", "-g", g, "-m", "a*:a", "b*:b")
-            assert_file_equal("out.yaml", out)
-def test_group_folder():
-    for g, others, out in [
-        ("a", ("b", fgroup.DEFAULT_GROUP), "a.py\na.txt\n"),
-        ("b", ("a", fgroup.DEFAULT_GROUP), "b.py\nb.txt\n"),
-        (fgroup.DEFAULT_GROUP, ("a", "b"), "c.py\nc.txt\n")
-    ]:
-        with file_tree(["a.txt", "b.txt", "c.txt", "a.py", "b.py", "c.py"]):
-            fgroup.main("out", "-f", "folder", "-g", g, "-m", "a*:a", "b*:b")
-            assert_file_equal(f"out/{g}.txt", out)
-            for other in others: assert not os.path.exists(f"out/{other}.txt")
+@pytest.mark.parametrize("g,out", [("a", "a.py\na.txt\n"), ("b", "b.py\nb.txt\n"), (DEFAULT_GROUP, "c.py\nc.txt\n")])
+def test_group_text(six_files: str, g: str, out: str):
+    fgroup.main("out.txt", "-g", g, "-m", "a*:a", "b*:b")
+    assert_file_equal("out.txt", out)
+@pytest.mark.parametrize("g,out", [("a", jdumps(["a.py", "a.txt"])), ("b", jdumps(["b.py", "b.txt"])), (DEFAULT_GROUP, jdumps(["c.py", "c.txt"]))])
+def test_group_json(six_files: str, g: str, out: str):
+    fgroup.main("out.json", "-g", g, "-m", "a*:a", "b*:b")
+    assert_file_equal("out.json", out)
+@pytest.mark.parametrize("g,out", [("a", "- a.py\n- a.txt\n"), ("b", "- b.py\n- b.txt\n"), (DEFAULT_GROUP, "- c.py\n- c.txt\n")])
+def test_group_yaml(six_files: str, g: str, out: str):
+    fgroup.main("out.yaml", "-g", g, "-m", "a*:a", "b*:b")
+    assert_file_equal("out.yaml", out)
+@pytest.mark.parametrize("g,others,out", [
+    ("a", ("b", DEFAULT_GROUP), "a.py\na.txt\n"),
+    ("b", ("a", DEFAULT_GROUP), "b.py\nb.txt\n"),
+    (DEFAULT_GROUP, ("a", "b"), "c.py\nc.txt\n")
+])
+def test_group_folder(six_files: str, g: str, others: 'tuple[str, ...]', out: str):
+    fgroup.main("out", "-f", "folder", "-g", g, "-m", "a*:a", "b*:b")
+    assert_file_equal(f"out/{g}.txt", out)
+    for other in others: assert not os.path.exists(f"out/{other}.txt")
 
 # Test -t -1, -t 0, -t 2, and -t
-def test_top_with_arg():
-    results = ntify([
-        ["a/b/c",9],["a",8],["a/b/c/1.py",4],["a/b/c/1.txt",4],["a/b/c/2.txt",4],
-        ["a/b",3],[".",2],["a/2.py",2],["a/3.py",2],["a/3.txt",2],["4.py",1],["4.txt",1]
-    ])
-    for args, result in [(("-1",), results), (("0",), results), (("2",), results[:2]), ((), results[:fgroup.DEFAULT_TOP])]:
-        with file_tree({"a": {"b": {"c": ["1.txt", "1.py", "2.txt"]}, "": ["3.txt", "2.py", "3.py"]}, "": ["4.txt", "4.py"]}):
-            fgroup.main("out.json", "-t", *args, "-m", "a/b/**.py:py", "a/**/*.txt:txt")
-            assert_json_equal("out.json", result)
+_TOP_RESULTS = ntify([
+    ["a/b/c",9],["a",8],["a/b/c/1.py",4],["a/b/c/1.txt",4],["a/b/c/2.txt",4],
+    ["a/b",3],[".",2],["a/2.py",2],["a/3.py",2],["a/3.txt",2],["4.py",1],["4.txt",1]
+])
+@pytest.mark.parametrize("args,result", [
+    (("-1",), _TOP_RESULTS), (("0",), _TOP_RESULTS), (("2",), _TOP_RESULTS[:2]), ((), _TOP_RESULTS[:DEFAULT_TOP])
+])
+def test_top_with_arg(args: 'tuple[str, ...]', result: 'list'):
+    with file_tree({"a": {"b": {"c": ["1.txt", "1.py", "2.txt"]}, "": ["3.txt", "2.py", "3.py"]}, "": ["4.txt", "4.py"]}):
+        fgroup.main("out.json", "-t", *args, "-m", "a/b/**.py:py", "a/**/*.txt:txt")
+        assert_json_equal("out.json", result)
 
 # Test 4 output formats with -t
 def test_top_text():
@@ -380,7 +460,7 @@ def test_top_text():
 def test_top_json():
     with file_tree({"a": {"b": {"c": ["1.txt", "1.py", "2.txt", "2.py"]}, "": ["3.txt", "3.py", "4.py"]}, "": ["4.txt", "5.py"]}):
         fgroup.main("out.json", "-t", "5", "-m", "a/b/*.py:py", "a/**/*.txt:txt", "a/**:rest")
-        assert_file_equal("out.json", ntify('[["a/b/c", 14], ["a", 8], ["a/b/c/1.py", 4], ["a/b/c/1.txt", 4], ["a/b/c/2.py", 4]]').replace("\\", "\\\\"))
+        assert_file_equal("out.json", jdumps(ntify([["a/b/c", 14], ["a", 8], ["a/b/c/1.py", 4], ["a/b/c/1.txt", 4], ["a/b/c/2.py", 4]])))
 def test_top_yaml():
     with file_tree({"a": {"b": {"c": ["1.txt", "1.py", "2.txt", "2.py"]}, "": ["3.txt", "3.py", "4.py"]}, "": ["4.txt", "5.py"]}):
         fgroup.main("out.yaml", "-t", "5", "-m", "a/b/*.py:py", "a/**/*.txt:txt", "a/**:rest")
@@ -391,84 +471,90 @@ def test_top_folder():
         assert not os.path.exists("out")
 
 # Test indentation with -i (-i -1, -i 0, -i 2, and -i)
-def test_indent_json():
-    for args, indent in [(("-1",), ""), (("0",), ""), (("2",), "  "), ((), " "*fgroup.DEFAULT_INDENT)]:
-        jdata = f'{{\n{indent}"a": [\n{indent}{indent}"."\n{indent}]\n}}'
-        with file_tree({}):
-            fgroup.main("out.json", "-m", ".:a", "-i", *args)
-            assert_file_equal("out.json", jdata)
-def test_indent_yaml():
-    for args, indent in [(("-1",), ""), (("0",), ""), (("2",), "  "), ((), " "*fgroup.DEFAULT_INDENT)]:
-        # No difference in yaml with indentation here.
-        ydata = "a:\n- .\n"
-        with file_tree({}):
-            fgroup.main("out.yaml", "-m", ".:a", "-i", *args)
-            assert_file_equal("out.yaml", ydata)
+_INDENT_ARGS = [(("-1",), ""), (("0",), ""), (("2",), "  "), ((), " "*DEFAULT_INDENT)]
+@pytest.mark.parametrize("args,jdata", [
+    (args, f'{{\n{i}"a": [\n{i}{i}"."\n{i}]\n}}') for args, i in _INDENT_ARGS
+])
+def test_indent_json(args: 'tuple[str, ...]', jdata: str):
+    with file_tree({}):
+        fgroup.main("out.json", "-m", ".:a", "-i", *args)
+        assert_file_equal("out.json", jdata)
+@pytest.mark.parametrize("args,indent", _INDENT_ARGS)
+def test_indent_yaml(args: 'tuple[str, ...]', indent: str):
+    # No difference in yaml with indentation here.
+    ydata = "a:\n- .\n"
+    with file_tree({}):
+        fgroup.main("out.yaml", "-m", ".:a", "-i", *args)
+        assert_file_equal("out.yaml", ydata)
 
 # Test indentation with -i and -t
-def test_indent_top_json():
-    for args, indent in [(("-1",), ""), (("0",), ""), (("2",), "  "), ((), " "*fgroup.DEFAULT_INDENT)]:
-        jdata = f'[\n{indent}[\n{indent}{indent}".",\n{indent}{indent}1\n{indent}]\n]'
-        with file_tree({}):
-            fgroup.main("out.json", "-m", ".:a", "-t", "-i", *args)
-            assert_file_equal("out.json", jdata)
-def test_indent_top_yaml():
-    for args, indent in [(("-1",), ""), (("0",), ""), (("3",), " "), ((), " "*(fgroup.DEFAULT_INDENT-2))]:
-        ydata = f"- {indent}- .\n  {indent}- 1\n"
-        with file_tree({}):
-            fgroup.main("out.yaml", "-m", ".:a", "-t", "-i", *args)
-            assert_file_equal("out.yaml", ydata)
+@pytest.mark.parametrize("args,jdata", [
+    (args, f'[\n{i}[\n{i}{i}".",\n{i}{i}1\n{i}]\n]') for args, i in _INDENT_ARGS
+])
+def test_indent_top_json(args: 'tuple[str, ...]', jdata: str):
+    with file_tree({}):
+        fgroup.main("out.json", "-m", ".:a", "-t", "-i", *args)
+        assert_file_equal("out.json", jdata)
+@pytest.mark.parametrize("args,indent", [(("-1",), ""), (("0",), ""), (("3",), " "), ((), " "*(DEFAULT_INDENT-2))])
+def test_indent_top_yaml(args: 'tuple[str, ...]', indent: str):
+    ydata = f"- {indent}- .\n  {indent}- 1\n"
+    with file_tree({}):
+        fgroup.main("out.yaml", "-m", ".:a", "-t", "-i", *args)
+        assert_file_equal("out.yaml", ydata)
 
 # Test indentation with -i and -g
-def test_indent_group_json():
-    for args, indent in [(("-1",), ""), (("0",), ""), (("2",), "  "), ((), " "*fgroup.DEFAULT_INDENT)]:
-        for g, out in [
-            ("a", f'[\n{indent}"a.py",\n{indent}"a.txt"\n]'),
-            ("b", f'[\n{indent}"b.py",\n{indent}"b.txt"\n]'),
-            (fgroup.DEFAULT_GROUP, f'[\n{indent}"c.py",\n{indent}"c.txt"\n]')
-        ]:
-            with file_tree(["a.txt", "b.txt", "c.txt", "a.py", "b.py", "c.py"]):
-                fgroup.main("out.json", "-g", g, "-m", "a*:a", "b*:b", "-i", *args)
-                assert_file_equal("out.json", out)
-def test_indent_group_yaml():
-    for args, indent in [(("-1",), ""), (("0",), ""), (("2",), "  "), ((), " "*fgroup.DEFAULT_INDENT)]:
-        # No difference in yaml with indentation here.
-        for g, out in [
-            ("a", "- a.py\n- a.txt\n"),
-            ("b", "- b.py\n- b.txt\n"),
-            (fgroup.DEFAULT_GROUP, "- c.py\n- c.txt\n")
-        ]:
-            with file_tree(["a.txt", "b.txt", "c.txt", "a.py", "b.py", "c.py"]):
-                fgroup.main("out.yaml", "-g", g, "-m", "a*:a", "b*:b", "-i", *args)
-                assert_file_equal("out.yaml", out)
+@pytest.mark.parametrize("args,cases", [
+    (args, [
+        ("a", f'[\n{i}"a.py",\n{i}"a.txt"\n]'),
+        ("b", f'[\n{i}"b.py",\n{i}"b.txt"\n]'),
+        (DEFAULT_GROUP, f'[\n{i}"c.py",\n{i}"c.txt"\n]')
+    ]) for args, i in _INDENT_ARGS
+])
+def test_indent_group_json(six_files: str, args: 'tuple[str, ...]', cases: 'list[tuple[str, str]]'):
+    for g, out in cases:
+        fgroup.main("out.json", "-g", g, "-m", "a*:a", "b*:b", "-i", *args)
+        assert_file_equal("out.json", out)
+        # Remove the output so the next round doesn't pick it up as an input file
+        os.unlink("out.json")
+@pytest.mark.parametrize("args,indent", _INDENT_ARGS)
+def test_indent_group_yaml(six_files: str, args: 'tuple[str, ...]', indent: str):
+    # No difference in yaml with indentation here.
+    for g, out in [
+        ("a", "- a.py\n- a.txt\n"),
+        ("b", "- b.py\n- b.txt\n"),
+        (DEFAULT_GROUP, "- c.py\n- c.txt\n")
+    ]:
+        fgroup.main("out.yaml", "-g", g, "-m", "a*:a", "b*:b", "-i", *args)
+        assert_file_equal("out.yaml", out)
+        # Remove the output so the next round doesn't pick it up as an input file
+        os.unlink("out.yaml")
 
 # Test overrides
-def test_overrides():
-    with file_tree(["a.txt", "b.txt", "c.txt", "a.py", "b.py", "c.py"]):
-        fgroup.main("out.json", "-m", "b*:a", "a*:b", "-o", "a:b", "b:a", fgroup.DEFAULT_GROUP+":bad")
-        assert_json_equal("out.json", {"a": ["a.py", "a.txt"], "b": ["b.py", "b.txt"], fgroup.DEFAULT_GROUP: ["c.py", "c.txt"]})
+def test_overrides(six_files: str):
+    fgroup.main("out.json", "-m", "b*:a", "a*:b", "-o", "a:b", "b:a", DEFAULT_GROUP+":bad")
+    assert_json_equal("out.json", {"a": ["a.py", "a.txt"], "b": ["b.py", "b.txt"], DEFAULT_GROUP: ["c.py", "c.txt"]})
 
 # Test root (-r)
 def test_root():
     with file_tree({"": ["a.txt", "a.py"], "1": {"": ["b.txt", "b.py"], "2": ["c.txt", "c.py"]}}):
         fgroup.main("out.json", "-r", "1", "-m", "**/*.py:py")
-        assert_json_equal("out.json", ntify({"py": ["2/c.py", "b.py"], fgroup.DEFAULT_GROUP: ["2/c.txt", "b.txt"]}))
-def test_absolute_root():
-    with file_tree(["a.txt", "b.txt", "c.txt", "a.py", "b.py", "c.py"]) as folder:
-        fgroup.main("out.json", "-d", "-r", "-m", f"{folder}/b*:b", f"{folder}/a*:a")
-        assert_json_equal("out.json", ntify({"a": [f"{folder}/a.py", f"{folder}/a.txt"], "b": [f"{folder}/b.py", f"{folder}/b.txt"]}))
+        assert_json_equal("out.json", ntify({"py": ["2/c.py", "b.py"], DEFAULT_GROUP: ["2/c.txt", "b.txt"]}))
+def test_absolute_root(six_files: str):
+    folder = six_files
+    fgroup.main("out.json", "-d", "-r", "-m", f"{folder}/b*:b", f"{folder}/a*:a")
+    assert_json_equal("out.json", ntify({"a": [f"{folder}/a.py", f"{folder}/a.txt"], "b": [f"{folder}/b.py", f"{folder}/b.txt"]}))
 def test_absolute_root_fill_children():
     with file_tree(["a.txt", "b.txt"]) as folder:
         fgroup.main("out.json", "-r", "", "-m", f"{folder}/a.txt:a")
         with open("out.json") as file: data = json.load(file)
-        assert len(data[fgroup.DEFAULT_GROUP]) > 0
+        assert len(data[DEFAULT_GROUP]) > 0
 
 # Test basic config
 def test_config_read():
     with file_tree({}):
         with file_config({}) as config:
             fgroup.main("out.json", "-c", config)
-            assert_json_equal("out.json", {fgroup.DEFAULT_GROUP: ["."]})
+            assert_json_equal("out.json", {DEFAULT_GROUP: ["."]})
 def test_config_errors():
     bad_data = [[], [3], 3, {3: "number"}, {None: "none"}, {"seven": 7}, {"none2": None}]
     bad_file_data = bad_data + [{"": "nothing"}, {", ", "emptysplit"}, {"s, ", "emptysplit2"}]
@@ -488,9 +574,10 @@ def test_config_errors():
             with file_config(conf_data) as config:
                 print(conf_data, file=sys.stderr)
                 assert fgroup.main("out.json", "-c", config) == 1
+_CFG_BASIC_YAML = 'files:\n  "*.py": python\n  "*.txt": text\n'
 def test_config_basic():
     with file_tree(["a.py", "b.py", "a.txt", "b.txt"]):
-        with file_config({"files": {"*.py": "python", "*.txt": "text"}}) as config:
+        with file_config_str(_CFG_BASIC_YAML) as config:
             fgroup.main("out.json", "-c", config)
             assert_json_equal("out.json", {"python": ["a.py", "b.py"], "text": ["a.txt", "b.txt"]})
 
@@ -514,7 +601,7 @@ def test_config_dir_only_match():
             assert_json_equal("out.json", ntify({
                 "a": ["1/2/a.py", "1/2/a.txt"],
                 "bc": ["1/2/b.py", "1/2/b.txt", "1/2.txt", "1/c.py", "1/c.txt"],
-                fgroup.DEFAULT_GROUP: ["1.txt", "d.py", "d.txt"]
+                DEFAULT_GROUP: ["1.txt", "d.py", "d.txt"]
             }))
 
 # Test config relative-to-current root
@@ -523,29 +610,31 @@ def test_config_root_current_directory():
         with open("1/config.yaml", "w") as file:
             json.dump({"root": ".", "files": {"*.txt": "text"}}, file)
         fgroup.main("out.json", "-c", "1/config.yaml")
-        assert_json_equal("out.json", {"text": ["b.txt"], fgroup.DEFAULT_GROUP: ["1"]})
+        assert_json_equal("out.json", {"text": ["b.txt"], DEFAULT_GROUP: ["1"]})
 # Test config relative-to-config root
 def test_config_root_relative_to_config():
     with file_tree({"1": ["a.txt"], "": ["a.txt"]}):
         with open("1/config.yaml", "w") as file:
             json.dump({"root": ".", "config_relative_root": True, "files": {"*.txt": "text"}}, file)
         fgroup.main("out.json", "-c", "1/config.yaml")
-        assert_json_equal("out.json", {"text": ["a.txt"], fgroup.DEFAULT_GROUP: ["config.yaml"]})
+        assert_json_equal("out.json", {"text": ["a.txt"], DEFAULT_GROUP: ["config.yaml"]})
 
 # Test script (-s)
-def test_bad_script():
-    for script in ["[", "run_action_a = 7", "run_action_b = None", "def run_action_a(): pass", "def run_action_b(l): raise ValueError"]:
-        with file_tree(["a.txt", "a.py", "b.txt", "b.py"]):
-            with open("script.py", "w") as file: file.write(script)
-            assert fgroup.main("-m", "a*:a", "b*:b", "-s", "script.py") == 1
+# Static scripts live next to the tests, so these don't rewrite the same file every run
+_SCRIPTS = Path(__file__).parent / "test_scripts"
+def test_unparsable_script():
+    # This one stays inline - an intentionally unparsable .py file in the package
+    # would trip compileall and linters
+    with file_tree(["a.txt", "a.py", "b.txt", "b.py"]):
+        with open("script.py", "w") as file: file.write("[")
+        assert fgroup.main("-m", "a*:a", "b*:b", "-s", "script.py") == 1
+@pytest.mark.parametrize("script", ["bad_int.py", "bad_none.py", "bad_noargs.py", "bad_raise.py"])
+def test_bad_script(script: str):
+    with file_tree(["a.txt", "a.py", "b.txt", "b.py"]):
+        assert fgroup.main("-m", "a*:a", "b*:b", "-s", str(_SCRIPTS / script)) == 1
 def test_good_script():
     with file_tree(["a.txt", "a.py", "b.txt", "b.py", "c.txt", "c.py"]):
-        with open("script.py", "w") as file: file.write(
-            "import os\n"
-            "def run_action_a(l):\n for i in l: os.unlink(i)\n"
-            "def run_actions(d):\n for i in d['b']: os.rename(i, i+'.rename')"
-        )
-        fgroup.main("-m", "a*:a", "b*:b", "-s", "script.py")
+        fgroup.main("-m", "a*:a", "b*:b", "-s", str(_SCRIPTS / "good.py"))
 
         for f in ["a.txt", "a.py", "b.txt", "b.py"]:
             assert not os.path.exists(f)
@@ -553,10 +642,7 @@ def test_good_script():
             assert os.path.exists(f)
 def test_script_args():
     with file_tree(["a.txt", "a.py", "b.txt", "b.py"]):
-        with open("script.py", "w") as file: file.write(
-            "import os\ndef run_actions(d, *args):\n for f in args: os.unlink(f)"
-        )
-        fgroup.main("-m", "*:all", "-s", "script.py", "-A", "a.txt", "a.py")
+        fgroup.main("-m", "*:all", "-s", str(_SCRIPTS / "args.py"), "-A", "a.txt", "a.py")
 
         assert not os.path.exists("a.txt")
         assert not os.path.exists("a.py")
@@ -2,18 +2,62 @@ from typing import TYPE_CHECKING
 if TYPE_CHECKING: # pragma: no cover
     from typing import Optional, Generator
 
-import os
+from functools import lru_cache
 
-from .util import DEFAULT_GROUP, abs_path, split_path, list_path, glob_root
+import os
+import sys
+
+from .util import DEFAULT_GROUP, abs_path, split_path, scan_path, glob_root
+
+
+@lru_cache(maxsize=1024)
+def _parse_glob(rglob: str) -> 'tuple[tuple[str, Optional[str], int, str], ...]':
+    """Parses a comma-separated glob into (kind, pre, n, leftover) tuples, one per sub-glob.
+
+    kind is "self", "dotdot", "recursive" or "plain". pre is the joined piece before the
+    special element (None when there is none), n counts successive ".."s, and leftover is
+    the joined piece after (the raw sub-glob for "plain"). Cached because load() re-runs
+    the same config keys once per matched directory.
+    """
+    # A local bound method turns the repeated os.path.sep attribute chain into a LOAD_FAST
+    join = os.path.sep.join
+    parsed = []
+    for glob_part in rglob.split(", "):
+        parts: 'list[str]' = [i for i in split_path(glob_part) if i != "."]
+        # If no parts are available, we stripped out all the ".".
+        if not parts:
+            parsed.append(("self", None, 0, ""))
+        elif ".." in parts:
+            pi = parts.index("..")
+            pre = None if pi == 0 else join(parts[:pi])
+            # Count number of successive ".."
+            n = 1
+            pi += 1
+            while pi < len(parts) and parts[pi] == "..":
+                pi += 1
+                n += 1
+            parsed.append(("dotdot", pre, n, join(parts[pi:])))
+        elif "**" in parts:
+            pi = parts.index("**")
+            pre = None if pi == 0 else join(parts[:pi])
+            parsed.append(("recursive", pre, 0, join(parts[pi+1:])))
+        else:
+            parsed.append(("plain", None, 0, glob_part))
+    return tuple(parsed)
 
 
 class FileTreeNode(object):
     "A node in the FileTree class."
+    __slots__ = (
+        "parent", "name", "path", "group", "visited", "expanded", "collapsed", "quasi",
+        "prune_guard", "children", "depth", "weight", "_is_dir", "_split_parts", "_glob_cache",
+    )
+
     def __init__(self, parent: 'Optional[FileTreeNode]', name: str, group: 'Optional[str]' = None, quasi: bool = False):
         self.parent: 'Optional[FileTreeNode]' = parent
         "The parent node of this node."
-        self.name = name
-        "The base name of the node."
+        self.name = sys.intern(name)
+        "The base name of the node. Interned, so children lookups can compare by pointer."
         # abs_path(name if not parent or parent.path == "" else join_path(parent.path, name))
         self.path: str = abs_path(parent.path, name) if parent else abs_path(os.getcwd(), name)
         "The full absolute path of the node including the root."
@@ -29,29 +73,43 @@ class FileTreeNode(object):
         "A quasi node is an unvisited node inserted only for caching purposes."
         self.prune_guard: int = 0
         "If >0, this node will not be able to be pruned, regardless of other factors."
-        self.children: 'dict[str, FileTreeNode]' = {}
-        "For folder nodes, each subfolder/file in the folder that has been marked."
-        self.weight: int = 0
+        self.children: 'Optional[dict[str, FileTreeNode]]' = None
+        "For folder nodes, each subfolder/file in the folder that has been marked. Allocated on first child - most leaves never need one."
+        self.depth: int = parent.depth + 1 if parent else 0
+        "The number of ancestors above this node."
+        self.weight: int = self.depth
         "A metric which represents how much work a node has done. Useful for finding paths to manually override."
+        self._is_dir: 'Optional[bool]' = None
+        "Whether this node is a directory, as reported by the parent's scandir. None if not yet known."
+        self._split_parts: 'Optional[list[str]]' = None
+        "Lazily cached split_path(self.path), reused across the sorts in glob_children."
+        self._glob_cache: 'dict[tuple[str, str, bool], tuple[str, ...]]' = parent._glob_cache if parent else {}
+        "Cache of glob_root() results, shared by every node of one tree run."
 
         # Add node to parent
-        if parent: parent.children[name] = self
-
-        for parent in self.ancestors():
-            self.weight += 1
+        if parent:
+            if parent.children is None: parent.children = {}
+            parent.children[name] = self
 
     def __repr__(self): # pragma: no cover
         return f'FileTreeNode(path={self.path!r})'
 
+    @property
+    def split_parts(self) -> 'list[str]':
+        "The split_path() parts of this node's path, computed once on first use."
+        if self._split_parts is None: self._split_parts = split_path(self.path)
+        return self._split_parts
+
     def prune(self):
         "Deletes this node and all unvisited parent nodes without children."
-        if self.prune_guard > 0 or self.children or self.visited or self.parent is None: return
-
-        # Record weight into parent to remember how much work was done on this node.
-        self.parent.weight += self.weight
-        if self.name in self.parent.children:
-            del self.parent.children[self.name]
-            self.parent.prune()
+        # Walks up iteratively - a long chain of childless ancestors shouldn't recurse.
+        node = self
+        while not (node.prune_guard > 0 or node.children or node.visited or node.parent is None):
+            # Record weight into parent to remember how much work was done on this node.
+            node.parent.weight += node.weight
+            if node.name not in node.parent.children: return
+            del node.parent.children[node.name]
+            node = node.parent
 
     def locate(self, path: 'list[str]') -> 'Optional[FileTreeNode]':
         "Locates the given decendant with the given path, creating it if it doesn't exist."
@@ -68,11 +126,22 @@ class FileTreeNode(object):
     def get_child(self, name: str, group: 'Optional[str]' = None, quasi: 'Optional[bool]' = None) -> 'FileTreeNode':
         "Gets the given child node, creating it if it doesn't exist."
         # Also, quasi state on to subnodes if not given.
-        return self.children[name] if name in self.children else FileTreeNode(self, name, group, self.quasi if quasi is None else quasi)
+        # A single .get() halves the dict probes on the hit path.
+        children = self.children
+        child = children.get(name) if children else None
+        if child is not None: return child
+        return FileTreeNode(self, name, group, self.quasi if quasi is None else quasi)
 
     def glob_nodes(self, rglob: str, dirs_only: bool = False) -> 'Generator[FileTreeNode]':
         "Globs up child nodes with glob_root(), creating them if they don't exist. "
-        for path in glob_root(self.path, rglob, dirs_only):
+        # Config branches re-run identical globs; each one walks the filesystem only once per tree.
+        key = (self.path, rglob, dirs_only)
+        paths = self._glob_cache.get(key)
+        if paths is None:
+            paths = tuple(glob_root(self.path, rglob, dirs_only))
+            self._glob_cache[key] = paths
+
+        for path in paths:
             node = self.locate(split_path(path))
             if node is not None: yield node
 
@@ -81,40 +150,29 @@ class FileTreeNode(object):
         self.weight += 1
         # TODO: Conditional sub-globbing.
 
-        # Keep track of how long
-        for glob_part in rglob.split(", "):
-            parts: 'list[str]' = [i for i in split_path(glob_part) if i != "."]
-            # If no parts are available, we stripped out all the ".". Therefore, yield self.
-            if not parts:
+        # The string analysis for each glob key is precompiled (and cached) by _parse_glob.
+        for kind, pre, n, leftover in _parse_glob(rglob):
+            # If no parts were available, all the "." were stripped out. Therefore, yield self.
+            if kind == "self":
                 yield self
                 return
 
             # Make .. function in globs by moving up directories
-            if ".." in parts:
-                pi = parts.index("..")
-
+            if kind == "dotdot":
                 # Handle pre-".." part if it exists
                 # NOTE: list() call is necessary here - we want to resolve ALL nodes before potentially going back on them and doing weird things to them.
-                sub_nodes = [self] if pi == 0 else list(self.glob_children(os.path.sep.join(parts[:pi])))
-
-                # Count number of successive ".."
-                n = 1
-                pi += 1
-                while pi < len(parts) and parts[pi] == "..":
-                    pi += 1
-                    n += 1
+                sub_nodes = [self] if pre is None else list(self.glob_children(pre))
 
                 # Collect all unique parent elements
                 parents = set(node.ancestor(n) for node in sub_nodes)
                 # Sort parent elements by path, so parents come before children
-                parents = sorted(parents, key=lambda p: split_path(p.path))
+                parents = sorted(parents, key=lambda p: p.split_parts)
 
                 for parent in parents: parent.prune_guard += 1
                 for node in sub_nodes: node.prune()
                 for parent in parents: parent.prune_guard -= 1
 
                 # Handle leftover
-                leftover = os.path.sep.join(parts[pi:])
                 if leftover:
                     for pnode in parents: yield from pnode.glob_children(leftover, dirs_only)
                 else:
@@ -124,15 +182,11 @@ class FileTreeNode(object):
                 return
 
             # Split into recursive and non-recursive paths.
-            if "**" in parts:
+            if kind == "recursive":
                 # Recursive paths are slow, so it's a good idea to work through them in memory to cache them.
-                # Split glob into parts to find pre-recursive part
-                pi = parts.index("**")
-
                 # Handle pre-recursive part if it exists
-                sub_nodes = [self] if pi == 0 else self.glob_nodes(os.path.sep.join(parts[:pi]))
+                sub_nodes = [self] if pre is None else self.glob_nodes(pre)
 
-                leftover = os.path.sep.join(parts[pi+1:])
                 if leftover:
                     # Any leftover part of the glob must be used on matched children.
                     for node in sub_nodes:
@@ -152,7 +206,7 @@ class FileTreeNode(object):
                 return
 
             # Non-recursive paths are fast enough to just glob as is
-            yield from self.glob_nodes(glob_part, dirs_only)
+            yield from self.glob_nodes(leftover, dirs_only)
 
 
     def visit(self, group: 'Optional[str]' = None):
@@ -167,15 +221,27 @@ class FileTreeNode(object):
         group = group or self.group or DEFAULT_GROUP
 
         # Nodes without children do not need to recurse.
-        if len(self.children) <= 0:
+        if not self.children:
             self.visited = True
             self.group = group
             return
 
-        # Visit all children in folder, including those not listed
-        items = list_path(self.path)
+        # Visit all children in folder, including those not listed.
+        # One scandir pass gives names and types together, so non-directory children can
+        # be marked in place instead of re-entering visit() just to bottom out.
+        items = scan_path(self.path)
         if items:
-            for name in items: self.get_child(name, group).visit(group)
+            for name, is_dir in items:
+                child = self.get_child(name, group)
+                if child.visited: continue
+                if not is_dir and not child.children:
+                    # What visit() would do for a leaf, minus the observe/collapse no-ops
+                    # (self is already observed, and a leaf has nothing to collapse)
+                    child.quasi = False
+                    child.group = group
+                    child.visited = True
+                else:
+                    child.visit(group)
         else:
             for child in self.children.values(): child.visit(group)
 
@@ -202,27 +268,40 @@ class FileTreeNode(object):
         # No need to collapse on nodes which have been visited or collapsed.
         if self.collapsed or self.visited: return
 
-        # Loop over all children and collapse or delete quasi nodes.
-        for name, child in list(self.children.items()):
-            if child.quasi:
-                # Record the child's weight to remember how much work was done on this node.
-                self.weight += child.weight
-                del self.children[name]
-            elif not child.collapsed:
-                child.collapse()
-
-        # Mark as collapsed.
-        self.expanded = False
-        self.collapsed = True
+        # An explicit worklist, so deep trees don't pay a stack frame per level.
+        stack = [self]
+        while stack:
+            node = stack.pop()
+            if node.visited: continue
+
+            # Loop over all children and collapse or delete quasi nodes.
+            children = node.children
+            if children:
+                for name, child in list(children.items()):
+                    if child.quasi:
+                        # Record the child's weight to remember how much work was done on this node.
+                        node.weight += child.weight
+                        del children[name]
+                    elif not child.collapsed:
+                        stack.append(child)
+
+            # Mark as collapsed.
+            node.expanded = False
+            node.collapsed = True
 
     def descendants(self, exclude_leaves: bool = False) -> 'Generator[FileTreeNode]':
         "Yields all unvisited descendant nodes (including self). Expand first for best results."
-        if self.visited: return
-
-        # Yield self first, because parents take priority over children when marking
-        if not exclude_leaves or self.children: yield self
-        for child in self.children.values():
-            if not child.visited: yield from child.descendants(exclude_leaves)
+        # An explicit stack avoids a chain of nested generator frames on deep trees.
+        stack = [self]
+        while stack:
+            node = stack.pop()
+            if node.visited: continue
+
+            # Yield the node before its children, because parents take priority when marking
+            children = node.children
+            if not exclude_leaves or children: yield node
+            # Reversed, so popping walks the children in their original order
+            if children: stack.extend(reversed(children.values()))
 
     def ancestors(self) -> 'Generator[FileTreeNode]':
         "Yields all ancestor nodes."
@@ -233,13 +312,15 @@ class FileTreeNode(object):
 
     def ancestor(self, n: int) -> 'FileTreeNode':
         "Gets the nth ancestor if it exists, or the closest ancestor if not."
+        if n <= 0: return self
         if n == 1: return self.parent or self
 
+        # The depth counter bounds the walk directly, with no per-step identity checks
+        target = self.depth - n
+        if target < 0: target = 0
         cursor = self
-        for _ in range(n):
-            cursor = cursor.parent or cursor
-            if cursor is self: return self
-
+        while cursor.depth > target and cursor.parent is not None:
+            cursor = cursor.parent
         return cursor
 
     def expand(self):
@@ -248,10 +329,13 @@ class FileTreeNode(object):
         if self.expanded or self.visited: return
 
         # Loop over children and expand them too.
-        isdir: bool = os.path.isdir(self.path)
+        # The type cached from the parent's scandir answers isdir without another stat.
+        isdir: bool = os.path.isdir(self.path) if self._is_dir is None else self._is_dir
         if isdir:
-            for name in list_path(self.path):
-                self.get_child(name, quasi=True).expand()
+            for name, is_dir in scan_path(self.path):
+                child = self.get_child(name, quasi=True)
+                child._is_dir = is_dir
+                child.expand()
 
         # Mark as expanded
         self.expanded = True
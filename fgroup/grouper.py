@@ -3,9 +3,11 @@ if TYPE_CHECKING: # pragma: no cover
     from typing import Optional, TypeAlias
     StrTree: TypeAlias = 'dict[str, str | StrTree]'
 
-from collections import Counter
+from collections import Counter, defaultdict
+from functools import cached_property
 
 import os
+import sys
 
 from .util import DEFAULT_GROUP, split_path
 from .filetree import FileTreeNode
@@ -13,6 +15,8 @@ from .filetree import FileTreeNode
 
 class DistinctFileTreeNode(FileTreeNode):
     "A version of file tree nodes that does not get visited"
+    __slots__ = ("grouper",)
+
     def __init__(self, *args, grouper: 'FileGrouper', **kwargs):
         self.grouper: 'FileGrouper' = grouper
         super().__init__(*args, **kwargs)
@@ -20,10 +24,11 @@ class DistinctFileTreeNode(FileTreeNode):
     def get_child(self, name: str, group: 'Optional[str]' = None, quasi: 'Optional[bool]' = None) -> 'FileTreeNode':
         "Gets the given child node, creating it if it doesn't exist."
         # Also, quasi state on to subnodes if not given.
-        if name in self.children:
-            return self.children[name]
-        else:
-            return DistinctFileTreeNode(self, name, group, self.quasi if quasi is None else quasi, grouper=self.grouper)
+        # A single .get() halves the dict probes on the hit path.
+        children = self.children
+        child = children.get(name) if children else None
+        if child is not None: return child
+        return DistinctFileTreeNode(self, name, group, self.quasi if quasi is None else quasi, grouper=self.grouper)
 
     def visit(self, group: 'Optional[str]' = None):
         "Visits this node by setting its own group only."
@@ -48,7 +53,7 @@ class FileGrouper(object):
         "The main file tree where marked files are stored"
         self.absolute = absolute
         "If True, paths are outputted as absolute paths instead of relative to the root."
-        self.groups: 'dict[str, list[str]]' = {}
+        self.groups: 'dict[str, list[str]]' = defaultdict(list)
         "Lists of paths, each distinguished by their group."
         self.weights: 'Counter[str]' = Counter()
         "The access count of every file path in the tree."
@@ -63,29 +68,54 @@ class FileGrouper(object):
             self.tree.visit()
             # Organize the tree into group lists.
             self.walk(self.tree)
-        # Organize groups.
-        for group in self.groups.values(): group.sort(key=lambda p: split_path(p))
+        # Organize groups. list.sort computes the key once per path, so passing split_path
+        # directly just drops the lambda indirection per element.
+        for group in self.groups.values(): group.sort(key=split_path)
+        # Back to a plain dict once filled, so emitters (yaml in particular) see a
+        # representable type and lookups stop creating empty groups.
+        self.groups = dict(self.groups)
+
+    @cached_property
+    def sorted_groups(self) -> 'list[tuple[str, list[str]]]':
+        "The group lists as (group, paths) pairs sorted by group name. Computed once on first use."
+        # Tuples already compare by their first element, so no key function is needed.
+        return sorted(self.groups.items())
+
+    def _rel(self, path: str) -> str:
+        "Makes a path relative to the root by slicing off the root prefix."
+        root = self.tree.path
+        if path.startswith(root):
+            if len(path) == len(root): return "."
+            start = len(root)
+            # The separator after the root isn't part of the relative path (a root like
+            # "/" already ends in one)
+            if root[-1] == os.sep: return path[start:]
+            if path[start] == os.sep: return path[start+1:]
+        # Fallback for the rare path that doesn't sit directly under the root
+        return os.path.relpath(path, root)
 
     def add_to_group(self, group: str, path: str):
         "Adds the given path to the given group, creating the group if it doesn't exist."
         # If path is not absolute, make it relative
-        if self.tree.path and not self.absolute: path = os.path.relpath(path, self.tree.path)
+        if self.tree.path and not self.absolute: path = self._rel(path)
 
-        # Add path to group
-        if group in self.groups:
-            self.groups[group].append(path)
-        else:
-            self.groups[group] = [path]
+        # Add path to group. The defaultdict runs the missing-key branch in C, and
+        # interning the group name makes repeat lookups compare by pointer.
+        self.groups[sys.intern(group)].append(path)
 
     def load(self, parent: FileTreeNode, config: 'StrTree'):
         "Uses the current config and parent folder to mark files recursively."
+        # Bound once per call, so the loop body runs on LOAD_FASTs instead of
+        # attribute lookups. Configs come from yaml, which only produces plain
+        # str/dict values, so the exact-type check is safe.
+        get_override = self.overrides.get
         # Loop over all entries in config
         for glob_key, data in config.items():
-            if isinstance(data, str):
+            if type(data) is str:
                 # If path data is a string, then it's a group. Mark nodes with group
                 for child in parent.glob_children(glob_key):
                     # Also apply override if available.
-                    child.visit(self.overrides.get(data, data))
+                    child.visit(get_override(data, data))
             else:
                 # Otherwise, recurse into data as a new config
                 # Only match directories though - they're the only things that can have subpaths.
@@ -96,17 +126,20 @@ class FileGrouper(object):
 
     def walk(self, node: FileTreeNode):
         "Walks through the file tree and collects nodes into group lists."
-        # Store access count.
-        path: str = os.path.relpath(node.path, self.tree.path) if self.tree.path and not self.absolute else node.path
-        self.weights[path] = node.weight
-
-        if node.group is None:
-            # If node has no group, then it's a folder and one of it's descendents does.
-            for child in node.children.values():
-                self.walk(child)
-        else:
-            # Otherwise, add child's path to group
-            self.add_to_group(node.group, node.path)
+        relative = bool(self.tree.path) and not self.absolute
+        stack = [node]
+        while stack:
+            node = stack.pop()
+            # Store access count.
+            path: str = self._rel(node.path) if relative else node.path
+            self.weights[path] = node.weight
+
+            if node.group is None:
+                # If node has no group, then it's a folder and one of it's descendents does.
+                if node.children: stack.extend(node.children.values())
+            else:
+                # Otherwise, add child's path to group
+                self.add_to_group(node.group, node.path)
 
 def group(
     root: str,
@@ -0,0 +1,4 @@
+import os
+
+def run_actions(d, *args):
+    for f in args: os.unlink(f)
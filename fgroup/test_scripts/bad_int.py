@@ -0,0 +1 @@
+run_action_a = 7
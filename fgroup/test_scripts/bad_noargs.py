@@ -0,0 +1 @@
+def run_action_a(): pass
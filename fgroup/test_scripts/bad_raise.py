@@ -0,0 +1 @@
+def run_action_b(l): raise ValueError
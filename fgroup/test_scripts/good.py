@@ -0,0 +1,7 @@
+import os
+
+def run_action_a(l):
+    for i in l: os.unlink(i)
+
+def run_actions(d):
+    for i in d["b"]: os.rename(i, i + ".rename")
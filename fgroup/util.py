@@ -2,6 +2,8 @@ from typing import TYPE_CHECKING
 if TYPE_CHECKING: # pragma: no cover
     from typing import NoReturn, Generator
 
+from functools import lru_cache
+
 import os
 import shutil
 import glob
@@ -85,6 +87,19 @@ else: # pragma: cover-if-unix
         except (OSError, FileNotFoundError, PermissionError, ValueError): return []
 
 
+# The same paths get split over and over during tree walks and sorts, so the split is
+# cached module-wide. NOTE: callers must treat the returned list as read-only.
+split_path = lru_cache(maxsize=65536)(split_path)
+
+
+def scan_path(path: str) -> 'list[tuple[str, bool]]':
+    "Lists a directory as (name, is_dir) pairs. The d_type from scandir usually answers is_dir without a stat per entry."
+    if path == "": return []
+    try:
+        with os.scandir(path) as entries:
+            return [(entry.name, entry.is_dir()) for entry in entries]
+    except (OSError, FileNotFoundError, PermissionError, ValueError): return []
+
 def glob_root(root: str, rglob: str, dirs_only: bool = False) -> 'Generator[str]':
     "Cross-platform glob relative to the root path. Root may be empty."
     # No glob means no files
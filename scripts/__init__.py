@@ -36,15 +36,19 @@ def cover():
     clean()
 
 def resetbuild():
-    with open(PROJECT, "r") as file:
-        data = VERSION.sub(lambda m: f'{m[1]}{m[3]}', file.read())
-    with open(PROJECT, "w") as file:
+    with open(PROJECT, "r+") as file:
+        # A template with group references keeps the substitution inside the C regex engine
+        data = VERSION.sub(r'\1\3', file.read())
+        file.seek(0)
+        file.truncate()
         file.write(data)
 
 def incbuild():
-    with open(PROJECT, "r") as file:
+    with open(PROJECT, "r+") as file:
+        # The build number needs arithmetic, so this one keeps its callback
         data = VERSION.sub(lambda m: f'{m[1]}.{int(m[2][1:])+1 if m[2] else 1}{m[3]}', file.read())
-    with open(PROJECT, "w") as file:
+        file.seek(0)
+        file.truncate()
         file.write(data)
 
 def build():